@@ -1,23 +1,140 @@
 import asyncio
+import contextlib
+import hashlib
 import json
+import os
+import platform
+import sys
+import tempfile
+from collections.abc import Iterable
+from importlib import metadata
+from pathlib import Path
 
 from curioso import _utils
 from curioso.app import ReportInfo
 
 # ruff: noqa: T201 allow print in CLI
 
+# Bump when the report or the cache file format changes.
+CACHE_VERSION = 2
 
-async def main() -> None:
-    data = await ReportInfo.probe()
-    print(
-        json.dumps(
-            data,
-            indent=2,
-            sort_keys=False,
-            cls=_utils.AutoEncoder,
-        ),
+# Environment the report depends on, a change in any of them invalidates cache.
+CACHE_ENV_VARS = [
+    "PATH",
+    "SNAP",
+    "SNAP_NAME",
+    "FLATPAK_ID",
+    "FLATPAK_SESSION_HELPER",
+]
+
+
+def _cache_path() -> Path | None:
+    if not (cache_home := os.environ.get("XDG_CACHE_HOME")):
+        try:
+            cache_home = Path.home() / ".cache"
+        except RuntimeError:  # no HOME and no passwd entry, e.g. docker run -u
+            return None
+    return Path(cache_home) / "curioso" / "probe.json"
+
+
+def _file_mtimes(paths: Iterable[str]) -> dict[str, int | None]:
+    mtimes: dict[str, int | None] = {}
+    for path in paths:
+        try:
+            mtimes[path] = Path(path).stat().st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def _cache_key() -> str:
+    try:
+        kernel_version = Path("/proc/version").read_text()
+    except OSError:
+        kernel_version = None
+    try:
+        curioso_version = metadata.version("curioso")
+    except metadata.PackageNotFoundError:
+        curioso_version = None
+    # Adding or removing a binary bumps its PATH directory's mtime.
+    path_dirs = [d for d in os.environ.get("PATH", "").split(os.pathsep) if d]
+    material = json.dumps(
+        [
+            CACHE_VERSION,
+            curioso_version,
+            sys.executable,
+            list(platform.uname()),
+            kernel_version,
+            [os.environ.get(var) for var in CACHE_ENV_VARS],
+            _file_mtimes(["/etc/os-release", *path_dirs]),
+        ],
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _watched_files(data: ReportInfo) -> dict[str, int | None]:
+    # The linker is only known after probing, so its mtimes are stored in
+    # the cache entry and compared on read (catches libc upgrades).
+    if not (data.libc and (linker := data.libc.selected_linker)):
+        return {}
+    return _file_mtimes([linker, str(Path(linker).parent)])
+
+
+def _read_cache(path: Path, key: str) -> str | None:
+    try:
+        cached = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+    files = cached.get("files")
+    if not isinstance(files, dict) or _file_mtimes(files) != files:
+        return None
+    report = cached.get("report")
+    return report if isinstance(report, str) else None
+
+
+def _write_cache(
+    path: Path,
+    key: str,
+    report: str,
+    files: dict[str, int | None],
+) -> None:
+    tmp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=path.parent,
+            prefix=f".{path.name}.",
+            delete=False,
+        ) as f:
+            tmp_path = Path(f.name)
+            json.dump({"key": key, "files": files, "report": report}, f)
+        tmp_path.replace(path)
+    except OSError:
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                tmp_path.unlink(missing_ok=True)
+
+
+def _dumps(data: ReportInfo) -> str:
+    return json.dumps(
+        data,
+        indent=2,
+        sort_keys=False,
+        cls=_utils.AutoEncoder,
     )
 
 
 def run_cli() -> None:
-    asyncio.run(main())
+    if os.environ.get("CURIOSO_NO_CACHE") == "1" or (path := _cache_path()) is None:
+        print(_dumps(asyncio.run(ReportInfo.probe())))
+        return
+
+    key = _cache_key()
+    if (report := _read_cache(path, key)) is None:
+        data = asyncio.run(ReportInfo.probe())
+        report = _dumps(data)
+        _write_cache(path, key, report, _watched_files(data))
+    print(report)
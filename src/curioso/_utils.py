@@ -1,33 +1,64 @@
 import asyncio
 import json
-import shutil
+import os
 import subprocess
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+# Maps a class to its __json__, filled in by the json_encodable decorator.
+JSON_ENCODERS: dict[type, Callable[[Any], Any]] = {}
+
+
+def json_encodable[T: type](cls: T) -> T:
+    JSON_ENCODERS[cls] = cls.__json__
+    return cls
+
+
+def to_json(o):
+    if encoder := JSON_ENCODERS.get(type(o)):
+        return encoder(o)
+    if hasattr(o, "__json__"):
+        return o.__json__()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
 
 
 class AutoEncoder(json.JSONEncoder):
     def default(self, o):
-        if hasattr(o, "__json__"):
-            return o.__json__()
-        return super().default(o)
+        return to_json(o)
 
 
 async def run_cmd(
     commands: list[str],
     executable: str | None = None,
+    time_limit: float = 6,
 ) -> tuple[bytes, bytes, int]:
-    proc = await asyncio.create_subprocess_exec(
-        *commands,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+    # One-shot command: a blocking run in a thread avoids setting up
+    # asyncio's child watcher and pipe transports.
+    proc = await asyncio.to_thread(
+        subprocess.run,
+        commands,
+        capture_output=True,
         executable=executable,
+        timeout=time_limit,
+        # The child is a short-lived probe, skip closing every inherited fd.
+        close_fds=False,
+        check=False,
     )
-    stdout, stderr = await proc.communicate()
+    return proc.stdout, proc.stderr, proc.returncode
 
-    if proc.returncode is None:
-        raise RuntimeError("Impossible to reach this code.")
 
-    return stdout, stderr, proc.returncode
+def iter_which(names: Iterable[str]) -> Iterator[str]:
+    # Like shutil.which per name, but PATH is split once for all names.
+    if not (path_env := os.environ.get("PATH", os.defpath)):
+        return
+    dirs = list(dict.fromkeys(path_env.split(os.pathsep)))
+    for name in names:
+        for d in dirs:
+            path = os.path.join(d, name)  # noqa: PTH118
+            if os.access(path, os.X_OK) and not os.path.isdir(path):  # noqa: PTH112
+                yield path
+                break
 
 
-def which_any(names: list[str]) -> list[str]:
-    return [n2 for n in names if (n2 := shutil.which(n))]
+def which_any(names: Iterable[str]) -> list[str]:
+    return list(iter_which(names))
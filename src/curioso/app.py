@@ -2,20 +2,29 @@
 
 from __future__ import annotations
 
-import glob
+import asyncio
+import mmap
 import os
 import platform
+import re
+import stat
+import struct
+import subprocess
+import sys
 from dataclasses import dataclass
+from functools import cache
+from itertools import chain
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from curioso import _utils
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from typing import Any
 
 
-PKG_BINARIES = [
+PKG_BINARIES = (
     "apt",
     "apt-get",
     "dnf",
@@ -30,18 +39,161 @@ PKG_BINARIES = [
     "swupd",
     "eopkg",
     "urpmi",
-]
-
-PATTERNS = [
-    "/lib*/ld-linux*.so*",
-    "/lib/*/ld-linux*.so*",
-    "/lib*/ld-*.so*",
-    "/lib/*/ld-*.so*",
-    "/lib*/ld-musl-*.so*",
-    "/lib/*/ld-musl-*.so*",
-]
+)
+
+# Native package managers by os-release ID/ID_LIKE, looked up before the rest.
+PKG_PRIORITY = {
+    "debian": ("apt", "apt-get"),
+    "ubuntu": ("apt", "apt-get"),
+    "fedora": ("dnf", "yum"),
+    "rhel": ("dnf", "yum"),
+    "centos": ("dnf", "yum"),
+    "suse": ("zypper",),
+    "opensuse": ("zypper",),
+    "arch": ("pacman",),
+    "alpine": ("apk",),
+    "void": ("xbps-install",),
+    "gentoo": ("emerge",),
+    "nixos": ("nix", "nix-env"),
+    "clear-linux-os": ("swupd",),
+    "solus": ("eopkg",),
+    "mageia": ("urpmi",),
+}
+
+# Kernel and machine info are invariant for the lifetime of the process.
+UNAME = platform.uname()
+
+# The environment does not change during the process, read it once at import.
+SNAP_ENV = bool(os.environ.get("SNAP") or os.environ.get("SNAP_NAME"))
+FLATPAK_ENV = bool(
+    os.environ.get("FLATPAK_ID") or os.environ.get("FLATPAK_SESSION_HELPER"),
+)
+
+# Matches ld-linux*.so*, ld-musl-*.so* and any other ld-*.so[.N] linker name.
+LINKER_RE = re.compile(r"ld-.*\.so(?:\.\d+)*")
+
+# glibc's ld.so embeds its --version banner in the binary, for example
+# ld.so (Debian GLIBC 2.36-9) stable release version 2.36.
+GLIBC_BANNER_RE = re.compile(
+    rb"ld\.so \([^)]*\) stable release version (\d+\.\d+(?:\.\d+)?)",
+)
+
+# ELF constants used to read the program interpreter of an executable.
+ELFCLASS64 = 2
+PT_INTERP = 3
+PHDR_SIZE_32 = 32
+PHDR_SIZE_64 = 56
+
+# Version lines printed by `<linker> --version`, matched on the raw bytes.
+LIBC_FAMILY_RE = re.compile(rb"musl|E?GLIBC|GNU C Library|GNU libc", re.IGNORECASE)
+GLIBC_RE = re.compile(
+    rb"(?:E?GLIBC|GNU C Library|GNU libc)[^\d]*(\d+\.\d+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+MUSL_RE = re.compile(
+    rb"musl libc.*?\bVersion\s+(\d+\.\d+(?:\.\d+)?)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@cache
+def _libc_ver() -> tuple[str, str]:
+    # Cached lazily, not at import: it scans the python executable.
+    return platform.libc_ver()
+
+
+def _iter_subdirs(directory: str, prefix: str = "") -> Iterator[str]:
+    """Yield non-hidden subdirectories of a directory starting with prefix."""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if (
+                    entry.name.startswith(prefix)
+                    and not entry.name.startswith(".")
+                    and entry.is_dir()
+                ):
+                    yield entry.path
+    except OSError:
+        return
+
+
+def _iter_linkers(directory: str) -> Iterator[str]:
+    """Yield executable dynamic linkers directly inside a directory."""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # Cheap prefix test first, most library entries are not ld-*.
+                if not (
+                    entry.name.startswith("ld-") and LINKER_RE.fullmatch(entry.name)
+                ):
+                    continue
+                try:
+                    mode = entry.stat().st_mode
+                except OSError:
+                    continue
+                if stat.S_ISREG(mode) and mode & 0o111:
+                    yield entry.path
+    except OSError:
+        return
+
+
+def _read_elf_interpreter(path: str) -> str | None:
+    """Read the dynamic linker (PT_INTERP) requested by an ELF executable."""
+    try:
+        with Path(path).open("rb") as f:
+            header = f.read(64)
+            if header[:4] != b"\x7fELF":
+                return None
+            is_64 = header[4] == ELFCLASS64
+            endian = "<" if header[5] == 1 else ">"
+            if is_64:
+                (phoff,) = struct.unpack_from(f"{endian}Q", header, 0x20)
+                phentsize, phnum = struct.unpack_from(f"{endian}HH", header, 0x36)
+            else:
+                (phoff,) = struct.unpack_from(f"{endian}I", header, 0x1C)
+                phentsize, phnum = struct.unpack_from(f"{endian}HH", header, 0x2A)
+            if phentsize < (PHDR_SIZE_64 if is_64 else PHDR_SIZE_32):
+                return None
+            f.seek(phoff)
+            table = f.read(phentsize * phnum)
+            for off in range(0, phentsize * phnum, phentsize):
+                if struct.unpack_from(f"{endian}I", table, off)[0] != PT_INTERP:
+                    continue
+                if is_64:
+                    p_offset, p_filesz = struct.unpack_from(
+                        f"{endian}Q16xQ",
+                        table,
+                        off + 8,
+                    )
+                else:
+                    p_offset, p_filesz = struct.unpack_from(
+                        f"{endian}I8xI",
+                        table,
+                        off + 4,
+                    )
+                f.seek(p_offset)
+                interpreter = f.read(p_filesz).rstrip(b"\0").decode()
+                return interpreter if os.access(interpreter, os.X_OK) else None
+    except (OSError, struct.error, UnicodeDecodeError):
+        return None
+    return None
+
+
+def _read_linker_strings(path: str) -> tuple[str, str] | None:
+    """Read libc family and version from a linker without executing it."""
+    try:
+        with (
+            Path(path).open("rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+        ):
+            if match := GLIBC_BANNER_RE.search(data):
+                return "glibc", match.group(1).decode()
+    except (OSError, ValueError):
+        pass
+    return None
 
 
+@_utils.json_encodable
 @dataclass
 class LibcInfo:
     """Libc detection info."""
@@ -61,31 +213,37 @@ class LibcInfo:
         }
 
     @staticmethod
-    def find_dynamic_linkers() -> str | None:
-        """Find dynamic linkers in standard locations."""
-        if not (
-            linkers := list(
-                {
-                    file
-                    for pattern in PATTERNS
-                    for file in glob.glob(pattern)  # noqa: PTH207
-                    if Path(file).is_file() and os.access(file, os.X_OK)
-                },
-            )
-        ):
-            return None
-
-        linkers.sort(
-            key=lambda linker: platform.machine() not in linker,  # True becomes 0
-        )
+    def iter_dynamic_linkers() -> Iterator[str]:
+        """Yield dynamic linkers in standard locations, machine matches first."""
+        # Same locations as the /lib*/ld-*.so* and /lib/*/ld-*.so* globs.
+        directories = chain(_iter_subdirs("/", "lib"), _iter_subdirs("/lib"))
+        other_linkers = []
+        for linker in chain.from_iterable(map(_iter_linkers, directories)):
+            if UNAME.machine in linker:
+                yield linker
+            else:
+                other_linkers.append(linker)
+        yield from other_linkers
 
-        return linkers[0]
+    @classmethod
+    def find_dynamic_linkers(cls) -> str | None:
+        """Find dynamic linkers in standard locations."""
+        return next(cls.iter_dynamic_linkers(), None)
 
     @classmethod
     async def detect_libc(cls) -> LibcInfo:
         """Detect libc family and version."""
-        linker_present = cls.find_dynamic_linkers()
-        libc_family, libc_version = platform.libc_ver()
+        libc_family, libc_version = _libc_ver()
+
+        if libc_family == "glibc" and libc_version:
+            # Python runs on this glibc, so the linker it requests is the one
+            # to report and the library directories need not be searched.
+            linker_present = await asyncio.to_thread(
+                _read_elf_interpreter,
+                sys.executable,
+            ) or await asyncio.to_thread(cls.find_dynamic_linkers)
+        else:
+            linker_present = await asyncio.to_thread(cls.find_dynamic_linkers)
 
         if libc_family == "glibc" or not linker_present:
             return cls(
@@ -94,22 +252,43 @@ class LibcInfo:
                 selected_linker=linker_present,
                 detector="platform.libc_ver" if linker_present else "unknown",
             )
-        else:
-            out, err, _ = await _utils.run_cmd([linker_present, "--version"])
-            combined = (out.decode() + "\n" + err.decode()).strip().lower()
-            libc_version = next(
-                line.strip().split()[1]
-                for line in combined.splitlines()
-                if line.startswith("version")
+
+        # musl has no version banner in the binary, don't scan its linker.
+        is_musl_linker = linker_present.rpartition("/")[2].startswith("ld-musl-")
+        if not is_musl_linker and (
+            linker_strings := await asyncio.to_thread(
+                _read_linker_strings,
+                linker_present,
             )
+        ):
             return cls(
-                family="musl",
-                version=libc_version,
+                family=linker_strings[0],
+                version=linker_strings[1],
+                selected_linker=linker_present,
+                detector="ld.so strings",
+            )
+        else:
+            try:
+                out, err, _ = await _utils.run_cmd([linker_present, "--version"])
+            except subprocess.TimeoutExpired:
+                return cls(selected_linker=linker_present, detector="ld --version")
+            output = out + b"\n" + err
+            if not (family := LIBC_FAMILY_RE.search(output)):
+                return cls(selected_linker=linker_present, detector="ld --version")
+            if family.group().lower() == b"musl":
+                libc_family, version_re = "musl", MUSL_RE
+            else:
+                libc_family, version_re = "glibc", GLIBC_RE
+            match = version_re.search(output, family.start())
+            return cls(
+                family=libc_family,
+                version=match.group(1).decode() if match else None,
                 selected_linker=linker_present,
                 detector="ld --version",
             )
 
 
+@_utils.json_encodable
 @dataclass
 class LddInfo:
     """Ldd detection info."""
@@ -146,6 +325,7 @@ class LddInfo:
         return cls()
 
 
+@_utils.json_encodable
 @dataclass()
 class ReportInfo:
     """System report metadata and compatibility info."""
@@ -174,44 +354,84 @@ class ReportInfo:
             "ldd": self.ldd_info,
         }
 
+    @staticmethod
+    def read_os_release() -> dict[str, str]:
+        """Read os-release fields, empty if the system has no os-release."""
+        try:
+            return platform.freedesktop_os_release()
+        except OSError:
+            return {}
+
     @staticmethod
     def detect_sandbox() -> dict[str, bool]:
         """Detect sandbox environment."""
-        snap = bool(os.environ.get("SNAP") or os.environ.get("SNAP_NAME"))
-        flatpak = bool(
-            os.environ.get("FLATPAK_ID")
-            or os.environ.get("FLATPAK_SESSION_HELPER")
-            or Path("/.flatpak-info").exists(),
-        )
-        return {"snap": snap, "flatpak": flatpak}
+        flatpak = FLATPAK_ENV
+        if not flatpak:
+            try:
+                os.stat("/.flatpak-info")  # noqa: PTH116
+                flatpak = True
+            except OSError:
+                pass
+        return {"snap": SNAP_ENV, "flatpak": flatpak}
 
-    @staticmethod
-    def choose_package_manager() -> dict[str, list[str]]:
-        """Choose available package manager."""
-        available_bins = _utils.which_any(PKG_BINARIES)
-        available_names = [str(Path(p).resolve()) for p in available_bins]
+    @classmethod
+    def choose_package_manager(
+        cls,
+        os_release: dict[str, str] | None = None,
+    ) -> dict[str, list[str]]:
+        """Choose available package manager, the distro's native ones first."""
+        if os_release is None:
+            os_release = cls.read_os_release()
+        distro_ids = [os_release.get("ID", ""), *os_release.get("ID_LIKE", "").split()]
+        candidates = dict.fromkeys(
+            chain(
+                *(PKG_PRIORITY.get(distro_id, ()) for distro_id in distro_ids),
+                PKG_BINARIES,
+            ),
+        )
+        available_bins = _utils.which_any(candidates)
+        available_names = [
+            os.path.realpath(p) if os.path.islink(p) else p  # noqa: PTH114
+            for p in available_bins
+        ]
 
         if available_bins:
             return {"packages": available_bins, "available": available_names}
 
         raise FileNotFoundError("No package manager found")
 
+    @classmethod
+    def _detect_distro_package_manager(
+        cls,
+    ) -> tuple[dict[str, str], dict[str, list[str]]]:
+        """Read os-release once and choose package manager from it."""
+        os_release = cls.read_os_release()
+        return os_release, cls.choose_package_manager(os_release)
+
     @classmethod
     async def probe(cls) -> ReportInfo:
         """Detect system configuration and runtime environment."""
-        os_name = platform.system()
+        os_name = UNAME.system
         supported = os_name.lower() == "linux"
         report = cls(
             os=os_name,
-            kernel=platform.release(),
+            kernel=UNAME.release,
             supported=supported,
-            machines=platform.machine(),
+            machines=UNAME.machine,
         )
 
         if not supported:
             return report
 
-        osr = platform.freedesktop_os_release()
+        (
+            (osr, report.package_manager),
+            report.sandbox,
+            report.libc,
+        ) = await asyncio.gather(
+            asyncio.to_thread(cls._detect_distro_package_manager),
+            asyncio.to_thread(cls.detect_sandbox),
+            LibcInfo.detect_libc(),
+        )
         report.distro = {
             "id": osr.get("ID"),
             "name": osr.get("NAME"),
@@ -219,9 +439,6 @@ class ReportInfo:
             "pretty_name": osr.get("PRETTY_NAME"),
             "id_like": osr.get("ID_LIKE"),
         }
-        report.sandbox = cls.detect_sandbox()
-        report.package_manager = cls.choose_package_manager()
-        report.libc = await LibcInfo.detect_libc()
         report.ldd_info = LddInfo.infer(
             report.libc.family,
             report.libc.selected_linker,
@@ -1,2 +1,252 @@
+import asyncio
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+from curioso import _cli, _utils, app
+from curioso.app import _read_elf_interpreter, _read_linker_strings
+
+
 def test_dummy():
     assert True
+
+
+def _elf64_with_interp(interpreter: bytes, phentsize: int = 56) -> bytes:
+    header = bytearray(64)
+    header[:6] = b"\x7fELF\x02\x01"
+    struct.pack_into("<Q", header, 0x20, 64)  # e_phoff
+    struct.pack_into("<HH", header, 0x36, phentsize, 1)  # e_phentsize, e_phnum
+    phdr = bytearray(56)
+    struct.pack_into("<I", phdr, 0, 3)  # p_type = PT_INTERP
+    struct.pack_into("<Q", phdr, 8, 64 + 56)  # p_offset
+    struct.pack_into("<Q", phdr, 32, len(interpreter) + 1)  # p_filesz
+    return bytes(header + phdr) + interpreter + b"\0"
+
+
+def test_read_elf_interpreter_fixture(tmp_path):
+    interpreter = tmp_path / "ld-test.so.1"
+    interpreter.write_bytes(b"")
+    interpreter.chmod(0o755)
+    path = tmp_path / "program"
+    path.write_bytes(_elf64_with_interp(str(interpreter).encode()))
+    assert _read_elf_interpreter(str(path)) == str(interpreter)
+
+
+@pytest.mark.parametrize("phentsize", [0, 32])
+def test_read_elf_interpreter_bad_phentsize(tmp_path, phentsize):
+    path = tmp_path / "program"
+    path.write_bytes(_elf64_with_interp(b"/lib/ld-test.so.1", phentsize))
+    assert _read_elf_interpreter(str(path)) is None
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="sys.executable is not ELF")
+def test_read_elf_interpreter_of_python():
+    interpreter = _read_elf_interpreter(sys.executable)
+    assert interpreter is not None
+    assert Path(interpreter).is_file()
+    assert os.access(interpreter, os.X_OK)
+
+
+def test_read_elf_interpreter_not_elf(tmp_path):
+    path = tmp_path / "script.sh"
+    path.write_text("#!/bin/sh\necho hello\n")
+    assert _read_elf_interpreter(str(path)) is None
+
+
+def test_read_elf_interpreter_truncated_header(tmp_path):
+    path = tmp_path / "truncated"
+    path.write_bytes(b"\x7fELF\x02\x01\x01")
+    assert _read_elf_interpreter(str(path)) is None
+
+
+def test_detect_libc_glibc_uses_elf_interpreter(monkeypatch):
+    def fail():
+        pytest.fail("find_dynamic_linkers should not be called")
+
+    monkeypatch.setattr(app, "_libc_ver", lambda: ("glibc", "2.36"))
+    monkeypatch.setattr(
+        app,
+        "_read_elf_interpreter",
+        lambda _path: "/lib64/ld-linux-x86-64.so.2",
+    )
+    monkeypatch.setattr(app.LibcInfo, "find_dynamic_linkers", staticmethod(fail))
+
+    libc = asyncio.run(app.LibcInfo.detect_libc())
+
+    assert libc.family == "glibc"
+    assert libc.version == "2.36"
+    assert libc.selected_linker == "/lib64/ld-linux-x86-64.so.2"
+    assert libc.detector == "platform.libc_ver"
+
+
+def test_read_linker_strings_glibc_banner(tmp_path):
+    path = tmp_path / "ld-linux-x86-64.so.2"
+    path.write_bytes(
+        b"\0GLIBC_2.2.5\0ld.so (Debian GLIBC 2.36-9) stable release version 2.36.\0",
+    )
+    assert _read_linker_strings(str(path)) == ("glibc", "2.36")
+
+
+def test_read_linker_strings_without_banner(tmp_path):
+    path = tmp_path / "ld-linux-x86-64.so.2"
+    path.write_bytes(b"\0GLIBC_2.2.5\0GLIBC_PRIVATE\0")
+    assert _read_linker_strings(str(path)) is None
+
+
+def test_read_linker_strings_empty_file(tmp_path):
+    path = tmp_path / "ld-linux-x86-64.so.2"
+    path.write_bytes(b"")
+    assert _read_linker_strings(str(path)) is None
+
+
+@pytest.mark.parametrize(
+    ("stdout", "stderr", "family", "version"),
+    [
+        (
+            (
+                b"ld.so (Debian GLIBC 2.36-9) stable release version 2.36.\n"
+                b"Copyright (C) 2022 Free Software Foundation, Inc.\n"
+            ),
+            b"",
+            "glibc",
+            "2.36",
+        ),
+        (
+            b"ld.so (GNU libc) stable release version 2.38.\n",
+            b"",
+            "glibc",
+            "2.38",
+        ),
+        (
+            b"ld.so (Ubuntu EGLIBC 2.19-0ubuntu6) stable release version 2.19\n",
+            b"",
+            "glibc",
+            "2.19",
+        ),
+        (
+            b"",
+            b"musl libc (x86_64)\nVersion 1.2.4\nDynamic Program Loader\n",
+            "musl",
+            "1.2.4",
+        ),
+        (
+            b"",
+            b"Usage: loader [options] [--] pathname [args]\n",
+            "unknown",
+            None,
+        ),
+    ],
+)
+def test_detect_libc_parses_linker_version(
+    monkeypatch,
+    stdout,
+    stderr,
+    family,
+    version,
+):
+    async def run_cmd(_commands, _executable=None):
+        return stdout, stderr, 1
+
+    monkeypatch.setattr(app, "_libc_ver", lambda: ("", ""))
+    monkeypatch.setattr(
+        app.LibcInfo,
+        "find_dynamic_linkers",
+        staticmethod(lambda: "/lib/ld-test.so.1"),
+    )
+    monkeypatch.setattr(app, "_read_linker_strings", lambda _path: None)
+    monkeypatch.setattr(_utils, "run_cmd", run_cmd)
+
+    libc = asyncio.run(app.LibcInfo.detect_libc())
+
+    assert libc.family == family
+    assert libc.version == version
+    assert libc.selected_linker == "/lib/ld-test.so.1"
+    assert libc.detector == "ld --version"
+
+
+@pytest.fixture
+def probe_calls(monkeypatch, tmp_path):
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        return app.ReportInfo(os="TestOS", kernel="1.0")
+
+    monkeypatch.delenv("CURIOSO_NO_CACHE", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(app.ReportInfo, "probe", staticmethod(probe))
+    return calls
+
+
+def test_run_cli_cache_hit_skips_probe(probe_calls, capsys):
+    _cli.run_cli()
+    first = capsys.readouterr().out
+    _cli.run_cli()
+
+    assert capsys.readouterr().out == first
+    assert json.loads(first)["os"] == "TestOS"
+    assert len(probe_calls) == 1
+
+
+def test_run_cli_key_mismatch_reprobes(probe_calls, tmp_path):
+    cache_file = tmp_path / "curioso" / "probe.json"
+    _cli.run_cli()
+    cached = json.loads(cache_file.read_text())
+    cache_file.write_text(json.dumps({**cached, "key": "stale"}))
+
+    _cli.run_cli()
+
+    assert len(probe_calls) == 2  # noqa: PLR2004
+    assert json.loads(cache_file.read_text())["key"] == cached["key"]
+
+
+@pytest.mark.parametrize("content", ["not json", "[1, 2]"])
+def test_run_cli_corrupt_cache_reprobes(probe_calls, tmp_path, content):
+    cache_file = tmp_path / "curioso" / "probe.json"
+    cache_file.parent.mkdir()
+    cache_file.write_text(content)
+
+    _cli.run_cli()
+
+    assert len(probe_calls) == 1
+    assert isinstance(json.loads(cache_file.read_text()), dict)
+
+
+def test_run_cli_no_cache_env_writes_nothing(probe_calls, tmp_path, monkeypatch):
+    monkeypatch.setenv("CURIOSO_NO_CACHE", "1")
+
+    _cli.run_cli()
+    _cli.run_cli()
+
+    assert len(probe_calls) == 2  # noqa: PLR2004
+    assert not (tmp_path / "curioso").exists()
+
+
+def test_run_cli_without_cache_path(probe_calls, monkeypatch, capsys):
+    def fail(*_args):
+        pytest.fail("cache should not be used")
+
+    monkeypatch.setattr(_cli, "_cache_path", lambda: None)
+    monkeypatch.setattr(_cli, "_read_cache", fail)
+    monkeypatch.setattr(_cli, "_write_cache", fail)
+
+    _cli.run_cli()
+
+    assert len(probe_calls) == 1
+    assert json.loads(capsys.readouterr().out)["os"] == "TestOS"
+
+
+def test_choose_package_manager_native_first(monkeypatch):
+    monkeypatch.setattr(_utils, "which_any", list)
+
+    package_manager = app.ReportInfo.choose_package_manager(
+        {"ID": "fedora", "ID_LIKE": ""},
+    )
+
+    packages = package_manager["packages"]
+    assert packages[:2] == ["dnf", "yum"]
+    assert sorted(packages) == sorted(app.PKG_BINARIES)